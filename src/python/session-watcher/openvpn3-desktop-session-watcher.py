@@ -8,62 +8,516 @@
 #  Copyright (C) 2025-  David Sommerseth <davids@openvpn.net>
 #
 
-import datetime
+import collections
 import dbus
+import math
 import openvpn3
 import os
+import queue
 import sys
+import threading
 import time
 from dbus.mainloop.glib import DBusGMainLoop
 from openvpn3.constants import SessionManagerEventType, StatusMajor, StatusMinor
-from gi.repository import GLib
+from gi.repository import Gio, GLib
 
 # Global main loop object
 mainloop = GLib.MainLoop()
 
+# UID of the user running this program, only sessions owned
+# by this user or root are watched
+_OWN_UID = os.getuid()
+
 # If the 'OPENVPN3_DEBUG' environment variable is found, debug logging will
 # be enabled and sent to the console
 OPENVPN3_DEBUG=os.getenv('OPENVPN3_DEBUG') is not None
 
-def DEBUG(msg):
-    if OPENVPN3_DEBUG:
+# Timestamps are formatted with microsecond resolution.  The part with
+# second resolution is cached, as it is the same for all events within
+# that second.
+_ts_cache = (None, '')
+
+def _ts():
+    global _ts_cache
+    now = time.time()
+    sec = int(now)
+    if sec != _ts_cache[0]:
+        _ts_cache = (sec, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(sec)))
+    return '%s.%06d' % (_ts_cache[1], int((now - sec) * 1000000))
+
+
+# The DEBUGF() variant only formats the message when debug logging is
+# enabled.  The {tstamp} field is always available, containing the
+# current time.
+if OPENVPN3_DEBUG:
+    def DEBUG(msg):
         print(msg)
 
+    def DEBUGF(fmt, *args, **kwargs):
+        print(fmt.format(*args, tstamp=_ts(), **kwargs))
+else:
+    def DEBUG(msg):
+        pass
+
+    def DEBUGF(fmt, *args, **kwargs):
+        pass
+
+
+# Integer values of the statuses acted upon.  The StatusChange signals
+# carry plain integers, which can be compared directly against these.
+_MAJ_SESSION = StatusMajor.SESSION.value
+_MAJ_CONNECTION = StatusMajor.CONNECTION.value
+_MIN_SESS_AUTH_URL = StatusMinor.SESS_AUTH_URL.value
+_MIN_CONN_CONNECTED = StatusMinor.CONN_CONNECTED.value
+_MIN_CONN_RECONNECTING = StatusMinor.CONN_RECONNECTING.value
+_MIN_CONN_DISCONNECTED = StatusMinor.CONN_DISCONNECTED.value
+
+
+class _NotifState(object):
+    """
+    Notification IDs of the open notifications for a single VPN session,
+    and the serial numbers of the Notify requests still waiting for a reply
+    """
+
+    __slots__ = ('auth_nid', 'reconn_nid', 'auth_req', 'reconn_req')
+
+    def __init__(self):
+        self.auth_nid = None
+        self.reconn_nid = None
+        self.auth_req = None
+        self.reconn_req = None
+
+    def empty(self):
+        return self.auth_nid is None and self.reconn_nid is None \
+            and self.auth_req is None and self.reconn_req is None
+
+
 
 class Notify(object):
     """
     Simple class interacting with the desktop notification API provided
     via the session D-Bus.  This API is documented here:
     https://specifications.freedesktop.org/notification-spec/notification-spec-latest.html
+
+    Only a single Notify object may exist, sharing the one proxy to the
+    notification service between all the session watchers.
+
+    All the interaction with the notification service happens in a
+    separate thread running its own GLib main context.  The public methods
+    only queue up the request for that thread, so a slow notification
+    service does not hold up the processing of session events.
     """
+    __instance = None
+
+    # Minimum interval in seconds between notifications of the same kind
+    # for a session.  Notification servers may reject notifications sent
+    # too often with an ExcessNotificationGeneration error.
+    MIN_INTERVAL = 2.0
+
     def __init__(self):
-        self.__bus = dbus.SessionBus()
+        assert Notify.__instance is None, 'Notify must only be instantiated once'
+        Notify.__instance = self
+
+        self.__bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        self.__context = GLib.MainContext()
+        self.__queue = queue.SimpleQueue()
+        self.__drain_lock = threading.Lock()
+        self.__drain_scheduled = False
+        self.__proxy = None
+        self.__state = {}
+        self.__serial = 0
+
+        # Notifications requested before the notification service is
+        # available are queued up and sent once it appears on the bus
+        self.__pending = collections.deque()
+
+        # Outgoing notification calls are collected and sent together from
+        # a single idle callback, so a burst of closes and notifications
+        # for the same event only wakes up the main loop once
+        self.__pending_closes = set()
+        self.__pending_notify = []
+        self.__flush_scheduled = False
+
+        # Rate limiting of notifications, by (session path, group).  The
+        # most recent notification suppressed is sent when the interval
+        # has passed, so the last state change is always shown.  The state
+        # is dropped when the session disconnects or its watcher is stopped.
+        self.__last_emit = {}
+        self.__deferred = {}
+
+        self.__thread = threading.Thread(target=self.__run, name='notify', daemon=True)
+        self.__thread.start()
+
+
+    def __run(self):
+        "Main loop of the notification thread"
+
+        # All D-Bus callbacks for calls and name watching set up from this
+        # thread will be dispatched via the notification main context
+        self.__context.push_thread_default()
+
+        # Track the owner of org.freedesktop.Notifications instead of
+        # polling for it; the proxy is set up when the name gets an owner.
+        # Notification services are often D-Bus activated, so ask the bus
+        # to start it if nothing owns the name yet.
+        self.__watch_id = Gio.bus_watch_name_on_connection(self.__bus,
+                                                           'org.freedesktop.Notifications',
+                                                           Gio.BusNameWatcherFlags.AUTO_START,
+                                                           self.__name_appeared,
+                                                           self.__name_vanished)
+        GLib.MainLoop(self.__context).run()
+
+
+    def __attach(self, source, callback, *args):
+        "Attaches a GLib source to the notification main context"
+
+        source.set_callback(lambda *ignored: callback(*args))
+        source.attach(self.__context)
+        return source
+
+
+    def __call(self, method, *args):
+        """
+        Queues a method call to be run in the notification thread.  This
+        is safe to call from any thread.
+        """
+        self.__queue.put((method, args))
+        with self.__drain_lock:
+            if self.__drain_scheduled:
+                return
+            self.__drain_scheduled = True
+        self.__attach(GLib.idle_source_new(), self.__drain)
 
-        object_connected = False
-        while object_connected == False:
+
+    def __drain(self):
+        "Runs all the queued method calls in the notification thread"
+
+        with self.__drain_lock:
+            self.__drain_scheduled = False
+        while True:
             try:
-                self.__object = self.__bus.get_object('org.freedesktop.Notifications', '/org/freedesktop/Notifications')
-                object_connected = True
-            except dbus.exceptions.DBusException:
-                print('Waiting for org.freedesktop.Notifications to become available')
-                time.sleep(10)
+                (method, args) = self.__queue.get_nowait()
+            except queue.Empty:
+                return False
+            method(*args)
+
+
+    def __name_appeared(self, connection, name, owner):
+        "Prepares the proxy to the notification service and flushes queued requests"
+
+        self.__proxy = Gio.DBusProxy.new_sync(connection,
+                                              Gio.DBusProxyFlags.DO_NOT_LOAD_PROPERTIES
+                                              | Gio.DBusProxyFlags.DO_NOT_CONNECT_SIGNALS,
+                                              None,
+                                              'org.freedesktop.Notifications',
+                                              '/org/freedesktop/Notifications',
+                                              'org.freedesktop.Notifications',
+                                              None)
+        DEBUGF('Connected to org.freedesktop.Notifications ({})', owner)
+
+        while len(self.__pending) > 0:
+            (method, args) = self.__pending.popleft()
+            method(*args)
 
-        self.__notify_method = self.__object.get_dbus_method('Notify','org.freedesktop.Notifications')
-        self.__close_notify_method = self.__object.get_dbus_method('CloseNotification','org.freedesktop.Notifications')
-        self.__auth_notif = {}
-        self.__reconn_notif = {}
+
+    def __name_vanished(self, connection, name):
+        if self.__proxy is not None:
+            DEBUG('org.freedesktop.Notifications disappeared')
+        print('Waiting for org.freedesktop.Notifications to become available')
+        self.__proxy = None
+
+
+    def __ready(self, method, *args):
+        """
+        Returns True if the notification service is available.  Otherwise
+        the call is queued up until it becomes available.
+        """
+        if self.__proxy is not None:
+            return True
+        self.__pending.append((method, args))
+        return False
 
 
-    def __notify(self, title, msg):
-        nid = self.__notify_method('OpenVPN 3 Linux', 0, 'network', title, msg, {}, {}, 0)
-        DEBUG('Notification ({}): title="{}", msg="{}"'.format(nid, title, msg))
+    def __throttle(self, group, path, method, *args):
+        """
+        Returns True if a notification for the given group and session was
+        sent too recently.  The call is then deferred until the minimum
+        interval has passed, replacing any call already deferred.
+        """
+        key = (path, group)
+        if key in self.__deferred:
+            self.__deferred[key][0:2] = (method, args)
+            return True
+
+        now = time.monotonic()
+        last = self.__last_emit.get(key)
+        if last is not None and now - last < self.MIN_INTERVAL:
+            delay = math.ceil((self.MIN_INTERVAL - (now - last)) * 1000)
+            source = self.__attach(GLib.timeout_source_new(delay),
+                                   self.__emit_deferred, key)
+            self.__deferred[key] = [method, args, source]
+            DEBUGF('Deferring {} notification for {} by {}ms', group, path, delay)
+            return True
+
+        self.__last_emit[key] = now
+        return False
+
+
+    def __emit_deferred(self, key):
+        (method, args, source) = self.__deferred.pop(key)
+        method(*args)
+        return False
+
+
+    def __forget(self, path):
+        """
+        Drops all rate limiting state for a session, including any
+        notification still deferred.  This must be called for every session
+        which ends, as a deferred notification would otherwise be sent for
+        a session which no longer exists.
+        """
+
+        for group in ('auth', 'reconnect'):
+            key = (path, group)
+            self.__last_emit.pop(key, None)
+            deferred = self.__deferred.pop(key, None)
+            if deferred is not None:
+                deferred[2].destroy()
+
+
+    def __schedule_flush(self):
+        if self.__flush_scheduled:
+            return
+        self.__flush_scheduled = True
+        self.__attach(GLib.idle_source_new(), self.__flush)
+
+
+    def __flush(self):
+        """
+        Sends all queued CloseNotification and Notify calls.  Closing
+        notifications is done first, as new notifications may replace them.
+        """
+        self.__flush_scheduled = False
+        if self.__proxy is None:
+            self.__pending_closes.clear()
+            for (group, path, serial, title, msg) in self.__pending_notify:
+                self.__request_done(group, path, serial)
+            self.__pending_notify.clear()
+            return False
+
+        closes = self.__pending_closes
+        self.__pending_closes = set()
+        for nid in closes:
+            self.__proxy.call('CloseNotification', GLib.Variant('(u)', (nid,)),
+                              Gio.DBusCallFlags.NONE, -1, None,
+                              self.__close_notify_done, nid)
+
+        notifs = self.__pending_notify
+        self.__pending_notify = []
+        for (group, path, serial, title, msg) in notifs:
+            self.__proxy.call('Notify',
+                              GLib.Variant('(susssasa{sv}i)',
+                                           ('OpenVPN 3 Linux', 0, 'network', title, msg, [], {}, 0)),
+                              Gio.DBusCallFlags.NONE, -1, None,
+                              self.__notify_done, (group, path, serial, title, msg))
+        return False
+
+
+    def __notify(self, group, path, title, msg):
+        """
+        Queues a new notification.  Once the notification service has
+        responded, the notification ID is tracked in the given group
+        ('auth' or 'reconnect') for the session path.  If group is None,
+        the notification is not tracked.
+
+        Each tracked request gets a serial number.  If the notification is
+        closed or replaced before the reply arrives, the serial number no
+        longer matches and the notification is closed as soon as its ID
+        is known.
+        """
+        serial = None
+        if group is not None:
+            st = self.__state.get(path)
+            if st is None:
+                st = self.__state[path] = _NotifState()
+            self.__serial += 1
+            serial = self.__serial
+            if 'auth' == group:
+                st.auth_req = serial
+            else:
+                st.reconn_req = serial
+        self.__pending_notify.append((group, path, serial, title, msg))
+        self.__schedule_flush()
+
+
+    def __request_done(self, group, path, serial, nid=None):
+        """
+        Records the notification ID of a completed Notify request, or
+        None if it failed.  Returns False if the request is no longer the
+        current one for the group and session path.
+        """
+        st = self.__state.get(path)
+        if st is None:
+            return False
+
+        if 'auth' == group:
+            if st.auth_req != serial:
+                return False
+            st.auth_req = None
+            st.auth_nid = nid
+        else:
+            if st.reconn_req != serial:
+                return False
+            st.reconn_req = None
+            st.reconn_nid = nid
+
+        if st.empty():
+            del self.__state[path]
+        return True
+
+
+    def __notify_done(self, proxy, result, data):
+        (group, path, serial, title, msg) = data
+        try:
+            nid = proxy.call_finish(result).unpack()[0]
+        except GLib.Error as excp:
+            if 'org.freedesktop.Notifications.Error.ExcessNotificationGeneration' \
+                    == Gio.DBusError.get_remote_error(excp):
+                DEBUGF('Notification rejected, too many notifications: title="{}"', title)
+            else:
+                print('Failed sending notification: {}'.format(excp.message))
+            if group is not None:
+                self.__request_done(group, path, serial)
+            return
+
+        DEBUGF('Notification ({}): title="{}", msg="{}"', nid, title, msg)
+        if group is not None and not self.__request_done(group, path, serial, nid):
+            # Closed, replaced or disconnected while waiting for the reply
+            DEBUGF('Notification ({}) is outdated, closing it', nid)
+            self.__close_notify(nid)
 
 
     def __close_notify(self, nid):
-        if nid is None:
+        if nid is None or self.__proxy is None:
+            return
+        self.__pending_closes.add(nid)
+        self.__schedule_flush()
+
+
+    def __close_notify_done(self, proxy, result, nid):
+        try:
+            proxy.call_finish(result)
+        except GLib.Error as excp:
+            DEBUGF('Failed closing notification ID {}: {}', nid, excp.message)
+            return
+        DEBUGF('Closed notification ID {}', nid)
+
+
+    def __web_authenticate(self, path, url):
+        if not self.__ready(self.__web_authenticate, path, url):
+            return
+
+        self.__close_notification('auth', path)
+        self.__notify('auth', path,
+                      'OpenVPN - Authentication Required',
+                      'Visit {}'.format(url))
+
+
+    def __connected(self, path, msg):
+        if not self.__ready(self.__connected, path, msg):
+            return
+        if self.__throttle('auth', path, self.__connected, path, msg):
+            return
+
+        self.__close_notification('auth', path)
+        self.__notify('auth', path,
+                      'OpenVPN - Authentication Successful',
+                      msg)
+
+
+    def __reconnecting(self, path, msg):
+        if not self.__ready(self.__reconnecting, path, msg):
+            return
+        if self.__throttle('reconnect', path, self.__reconnecting, path, msg):
+            return
+
+        self.__close_notification('reconnect', path)
+        self.__notify('reconnect', path,
+                      'OpenVPN session reconnecting',
+                      msg)
+
+
+    def __reconnected(self, path, msg):
+        if not self.__ready(self.__reconnected, path, msg):
+            return
+        if self.__throttle('reconnect', path, self.__reconnected, path, msg):
+            return
+
+        self.__close_notification('reconnect', path)
+        self.__notify('reconnect', path,
+                      'OpenVPN session reconnected',
+                      msg)
+
+
+    def __disconnected(self, path, msg):
+        if not self.__ready(self.__disconnected, path, msg):
             return
-        self.__close_notify_method(nid)
-        DEBUG('Closed notification ID {}'.format(nid))
+
+        # Close all open notifications for this session, which also
+        # stops tracking it.  The disconnect notification is left as is.
+        self.__forget(path)
+        self.__close_notification('auth', path)
+        self.__close_notification('reconnect', path)
+        self.__notify(None, path,
+                      'OpenVPN session disconnected',
+                      msg)
+
+
+    def __take_nid(self, group, path):
+        """
+        Returns the notification ID tracked in the given group for a
+        session path and stops tracking it.  Returns None if there is
+        no notification tracked.  A Notify request still waiting for a
+        reply is abandoned; that notification is closed when the reply
+        arrives.
+        """
+        st = self.__state.get(path)
+        if st is None:
+            return None
+
+        nid = None
+        if 'auth' == group:
+            nid = st.auth_nid
+            st.auth_nid = None
+            st.auth_req = None
+        elif 'reconnect' == group:
+            nid = st.reconn_nid
+            st.reconn_nid = None
+            st.reconn_req = None
+
+        if st.empty():
+            del self.__state[path]
+        return nid
+
+
+    def __close_notification(self, group, path):
+        self.__close_notify(self.__take_nid(group, path))
+
+
+    def __close_notification_async(self, group, path):
+        # Used when a session watcher is stopped; a deferred notification
+        # must not show up for a session which is gone
+        self.__forget(path)
+
+        nid = self.__take_nid(group, path)
+        if nid is None or self.__proxy is None:
+            return
+
+        # No reply is processed; if the notification service is gone,
+        # the notification is gone as well
+        self.__proxy.call('CloseNotification', GLib.Variant('(u)', (nid,)),
+                          Gio.DBusCallFlags.NO_AUTO_START, -1, None, None, None)
+        DEBUGF('Closing notification ID {}', nid)
 
 
     def WebAuthenticate(self, path, url):
@@ -71,60 +525,39 @@ class Notify(object):
         An on-going VPN session is requesting authentication via a web portal, notify the user
         with the appropriate URL to do the authentication
         """
+        self.__call(self.__web_authenticate, path, url)
 
-        if path in self.__auth_notif:
-            self.CloseNotification('auth', path)
-        self.__auth_notif[path] = self.__notify('OpenVPN - Authentication Required',
-                                                'Visit {}'.format(url))
 
+    def Connected(self, path, msg):
+        self.__call(self.__connected, path, msg)
 
-    def Connected(self, path, name):
-        if path in self.__auth_notif:
-            self.CloseNotification('auth', path)
-        self.__auth_notif[path] = self.__notify('OpenVPN - Authentication Successful',
-                                                'OpenVPN session "{}" connected successfully'.format(name))
 
-
-    def Reconnecting(self, path, name):
+    def Reconnecting(self, path, msg):
         "A reconnection has started, inform the user"
-
-        if path in self.__reconn_notif:
-            self.CloseNotification('reconnect', path)
-        self.__reconn_notif[path] = self.__notify('OpenVPN session reconnecting',
-                                                  'Session "{}" is reconnecting'.format(name))
+        self.__call(self.__reconnecting, path, msg)
 
 
-    def Reconnected(self, path, name):
+    def Reconnected(self, path, msg):
         "The reconnection was successful, inform the user"
-
-        if path in self.__reconn_notif:
-            self.CloseNotification('reconnect', path)
-        self.__reconn_notif[path] = self.__notify('OpenVPN session reconnected',
-                                                  'Session "{}" reconnected successfully'.format(name))
+        self.__call(self.__reconnected, path, msg)
 
 
-    def Disconnected(self, path, name):
+    def Disconnected(self, path, msg):
         "The VPN session was disconnected, notify the user"
-
-        if path in self.__auth_notif:
-            self.CloseNotification('auth', path)
-        if path in self.__reconn_notif:
-            self.CloseNotification('reconnect', path)
-
-        self.__reconn_notif[path] = self.__notify('OpenVPN session disconnected',
-                                                  'Session "{}" was disconnected'.format(name))
+        self.__call(self.__disconnected, path, msg)
 
 
     def CloseNotification(self, group, path):
         "Close any open notifications for the given session path"
+        self.__call(self.__close_notification, group, path)
 
-        if 'auth' == group:
-            if path in self.__auth_notif:
-                self.__close_notify(self.__auth_notif[path])
-        elif 'reconnect' == group:
-            if path in self.__reconn_notif:
-                self.__close_notify(self.__reconn_notif[path])
 
+    def CloseNotificationAsync(self, group, path):
+        """
+        Close any open notifications for the given session path, without
+        waiting for or checking the result
+        """
+        self.__call(self.__close_notification_async, group, path)
 
 
 
@@ -134,84 +567,216 @@ class SessionWatcher(object):
     On certain events, a desktop notification will be triggered
     """
 
-    def __init__(self, notify, session):
+    # Upper limit of the delay between attempts to query a new session,
+    # and how many attempts to make before giving up
+    MAX_RETRY_DELAY = 1000
+    MAX_ATTEMPTS = 8
+
+    def __init__(self, notify, sysbus, session, cfgname=None, check_status=False, failed=None):
         """
         Prepares a new SessionWatcher.  The notify argument must be pointing
-        at an existing Notify object.  The session argument must be an
-        openvpn3.Session object.
+        at an existing Notify object.  The sysbus argument must be a
+        Gio.DBusConnection to the system bus.  The session argument must be
+        an openvpn3.Session object.  If the configuration name of the
+        session is already known, it can be provided via cfgname.  If
+        check_status is True, the current status of the session is
+        retrieved and evaluated once the watcher has started.  If the
+        session cannot be queried, the failed function is called with the
+        session path and this SessionWatcher object.
         """
 
         self.__notify = notify
+        self.__sysbus = sysbus
         self.__session = session
         self.__reconnecting = False
-
-        # Wait for the session to settle a bit before
-        # trying to interact with it
-        time.sleep(1)
         self.__path = self.__session.GetPath()
-        self.__cfgname = self.__session.GetProperty('config_name')
+        self.__cfgname = cfgname
+        self.__subscription = None
+        self.__retry_id = None
+        self.__retry_delay = 50
+        self.__attempts = 0
+        self.__failed = failed
+        self.__check_status = check_status
+        self.__status_seen = False
+
+        # A newly created session might not be ready to be queried yet.
+        # If so, retry with an increasing delay instead of blocking the
+        # main loop until the session has settled.
+        self.__start()
+
+
+    def __start(self):
+        """
+        Retrieves the configuration name of the session and starts
+        listening for StatusChange events once it is available
+        """
+        self.__retry_id = None
+        try:
+            if self.__cfgname is None:
+                self.__attempts += 1
+                self.__cfgname = self.__session.GetProperty('config_name')
+        except dbus.exceptions.DBusException as excp:
+            if self.__attempts >= SessionWatcher.MAX_ATTEMPTS:
+                print('Could not retrieve the configuration name for {}: {}'.format(self.__path, excp))
+                if self.__failed is not None:
+                    self.__failed(self.__path, self)
+                return False
+            DEBUGF('Session {} not ready, retrying in {}ms', self.__path, self.__retry_delay)
+            self.__retry_id = GLib.timeout_add(self.__retry_delay, self.__start)
+            self.__retry_delay = min(self.__retry_delay * 2, SessionWatcher.MAX_RETRY_DELAY)
+            return False
+
+        # The configuration name does not change, so the
+        # notification messages can be prepared once
+        self.__msg_conn_ok = 'OpenVPN session "{}" connected successfully'.format(self.__cfgname)
+        self.__msg_reconn = 'Session "{}" is reconnecting'.format(self.__cfgname)
+        self.__msg_reconn_ok = 'Session "{}" reconnected successfully'.format(self.__cfgname)
+        self.__msg_disc = 'Session "{}" was disconnected'.format(self.__cfgname)
+
+        # Set up StatusChange event handler for this session.  The signal
+        # subscription is done via GDBus, which receives and parses the
+        # signals in its own worker thread before dispatching them to the
+        # main loop.  StatusChange signals are only sent while log
+        # forwarding is enabled for the session.
+        self.__subscription = self.__sysbus.signal_subscribe('net.openvpn.v3.log',
+                                                             'net.openvpn.v3.backends',
+                                                             'StatusChange',
+                                                             str(self.__path),
+                                                             None,
+                                                             Gio.DBusSignalFlags.NONE,
+                                                             self.__status_chg_handler)
+        self.__log_forward(True)
+        DEBUGF('Starting SessionWatcher("{}")', self.__path)
+        return False
+
+
+    def __log_forward(self, enable):
+        "Enables or disables log forwarding from the VPN session"
+
+        self.__sysbus.call('net.openvpn.v3.sessions', str(self.__path),
+                           'net.openvpn.v3.sessions', 'LogForward',
+                           GLib.Variant('(b)', (enable,)), None,
+                           Gio.DBusCallFlags.NONE, -1, None,
+                           self.__log_forward_done, enable)
+
+
+    def __log_forward_done(self, conn, result, enable):
+        try:
+            conn.call_finish(result)
+        except GLib.Error as excp:
+            # If disabling fails, the session is typically already removed
+            DEBUGF('LogForward({}) failed for {}: {}', enable, self.__path, excp.message)
+            return
+
+        # The current status is only retrieved once StatusChange signals
+        # are being forwarded, so no status change can be missed between
+        # reading the status and receiving the signals
+        if enable and self.__check_status:
+            self.__check_status = False
+            self.__status_seen = False
+            self.__sysbus.call('net.openvpn.v3.sessions', str(self.__path),
+                               'org.freedesktop.DBus.Properties', 'Get',
+                               GLib.Variant('(ss)', ('net.openvpn.v3.sessions', 'status')),
+                               GLib.VariantType.new('(v)'),
+                               Gio.DBusCallFlags.NONE, -1, None,
+                               self.__get_status_done, None)
+
+
+    def __get_status_done(self, conn, result, data):
+        try:
+            (major, minor, msg) = conn.call_finish(result).unpack()[0]
+        except GLib.Error as excp:
+            DEBUGF('Could not retrieve the status of {}: {}', self.__path, excp.message)
+            return
 
-        # Set up StatusChange event handler for this session
-        self.__session.StatusChangeCallback(self.__status_chg_handler)
-        DEBUG('Starting SessionWatcher("{}")'.format(self.__path))
+        # A StatusChange signal received while waiting for the reply has
+        # already been evaluated, and the reply carries the same status
+        if self.__subscription is not None and not self.__status_seen:
+            self.__evaluate_status(major, minor, msg)
 
 
-    def __status_chg_handler(self, major, minor, msg):
+    def __status_chg_handler(self, conn, sender, path, interface, signal, params):
         """
         The internal StatusChange event handler which is called each time
         the status changes for the VPN session
         """
-
-        # Convert the input arguments to openvpn3 constant values
-        maj = openvpn3.StatusMajor(major)
-        min = openvpn3.StatusMinor(minor)
-        self.__evaluate_status(maj, min, msg)
+        (major, minor, msg) = params.unpack()
+        self.__status_seen = True
+        self.__evaluate_status(major, minor, msg)
 
 
     def __evaluate_status(self, major, minor, msg):
         """
         Internal method to validate the session status
-        and act upon certain statuses
+        and act upon certain statuses.  The major and minor
+        arguments are the integer values of the status.
         """
-        DEBUG('{tstamp} StatusChange({maj}, {min}) {msg}'.format(tstamp=datetime.datetime.now(),
-                                                                 maj=major, min=minor, msg=msg))
+        if OPENVPN3_DEBUG:
+            DEBUGF('{tstamp} StatusChange({maj}, {min}) {msg}',
+                   maj=StatusMajor(major), min=StatusMinor(minor), msg=msg)
 
         #  Handle certain events
-        if StatusMajor.SESSION == major:
-            if StatusMinor.SESS_AUTH_URL == minor:
-                self.__notify.WebAuthenticate(self.__path, msg)
-                return
-        elif StatusMajor.CONNECTION == major:
-            DEBUG('flags: reconnecting={}'.format(self.__reconnecting))
-            if StatusMinor.CONN_CONNECTED == minor:
-                if self.__reconnecting is False:
-                    self.__notify.Connected(self.__path, self.__cfgname)
-                else:
-                    self.__notify.Reconnected(self.__path, self.__cfgname)
-                    self.__reconnecting = False
-                return
-            elif StatusMinor.CONN_RECONNECTING == minor:
-                self.__notify.Reconnecting(self.__path, self.__cfgname)
-                self.__reconnecting = True
-                return
-            elif StatusMinor.CONN_DISCONNECTED == minor:
-                self.__notify.Disconnected(self.__path, self.__cfgname)
-                return
+        handler = self.__DISPATCH.get((major, minor))
+        if handler is not None:
+            handler(self, msg)
+
+
+    def __handle_auth_url(self, msg):
+        self.__notify.WebAuthenticate(self.__path, msg)
+
+
+    def __handle_connected(self, msg):
+        DEBUGF('flags: reconnecting={}', self.__reconnecting)
+        if self.__reconnecting is False:
+            self.__notify.Connected(self.__path, self.__msg_conn_ok)
+        else:
+            self.__notify.Reconnected(self.__path, self.__msg_reconn_ok)
+            self.__reconnecting = False
 
 
-    def CheckStatus(self):
-        "Check and evaluate the status of the session"
+    def __handle_reconnecting(self, msg):
+        DEBUGF('flags: reconnecting={}', self.__reconnecting)
+        self.__notify.Reconnecting(self.__path, self.__msg_reconn)
+        self.__reconnecting = True
 
-        status = self.__session.GetStatus()
-        self.__evaluate_status(status['major'], status['minor'], status['message'])
+
+    def __handle_disconnected(self, msg):
+        DEBUGF('flags: reconnecting={}', self.__reconnecting)
+        self.__notify.Disconnected(self.__path, self.__msg_disc)
+
+
+    # Status events which are acted upon, mapped to their handler
+    __DISPATCH = {
+        (_MAJ_SESSION, _MIN_SESS_AUTH_URL): __handle_auth_url,
+        (_MAJ_CONNECTION, _MIN_CONN_CONNECTED): __handle_connected,
+        (_MAJ_CONNECTION, _MIN_CONN_RECONNECTING): __handle_reconnecting,
+        (_MAJ_CONNECTION, _MIN_CONN_DISCONNECTED): __handle_disconnected,
+    }
 
 
     def Stop(self):
         "Stops the current SessionWatcher.  This object is inactive after this call."
 
-        DEBUG('Stopping SessionWatcher("{}")'.format(self.__path))
-        self.__notify.CloseNotification('auth', self.__path)
-        self.__session.StatusChangeCallback(None)
+        DEBUGF('Stopping SessionWatcher("{}")', self.__path)
+        self.__notify.CloseNotificationAsync('auth', self.__path)
+        if self.__retry_id is not None:
+            GLib.source_remove(self.__retry_id)
+            self.__retry_id = None
+        if self.__subscription is not None:
+            self.__sysbus.signal_unsubscribe(self.__subscription)
+            self.__subscription = None
+            self.__log_forward(False)
+
+
+
+class _PendingSession(object):
+    "A VPN session waiting for its configuration name before being registered"
+
+    __slots__ = ('session', 'check_status')
+
+    def __init__(self, session, check_status):
+        self.session = session
+        self.check_status = check_status
 
 
 
@@ -222,60 +787,170 @@ class SessionManagerWatcher(object):
     which is used to pick up the VPN session paths to further add additional checks."
     """
 
-    def __init__(self, sessmgr):
+    def __init__(self, sessmgr, sysbus):
         """
         Prepares the SessionManagerWathcer object.  The sessmgr argument must point
-        "at an instantiated openvpn3.SessionManager() object.
+        "at an instantiated openvpn3.SessionManager() object.  The sysbus argument
+        must be a Gio.DBusConnection to the system bus.
         """
 
-        # Sets up the notification interface
+        # Sets up the notification interface, shared by all session watchers
         self.__notify = Notify()
 
-        # Sets up the event listener for manager event
         self.__sessmgr = sessmgr
-        self.__sessmgr.SessionManagerCallback(self.__mgr_event_handler)
+        self.__sysbus = sysbus
 
         # Initializes the list of sessions being monitored
         self.__sessions = {}
 
+        # Configuration names of known sessions, by session path
+        self.__config_cache = {}
 
-    def __mgr_event_handler(self, event):
-        "Event handler method for StatusManagerEvents"
+        # Sessions waiting for their configuration name and status to be
+        # retrieved before being registered, as _PendingSession objects
+        self.__fetching = {}
 
-        # If debug logging is enabled, provide information on events
-        DEBUG('{tstamp} {event}'.format(tstamp=datetime.datetime.now(),
-                                            event=str(event)))
+        # Newly created sessions are collected and registered together
+        # from an idle callback, to handle bursts of new sessions at once
+        self.__pending_register = []
+        self.__register_scheduled = False
+
+        # Sets up the event listener for manager events.  The match rule
+        # restricts delivery to the signals from the session manager object
+        # itself.  The owner UID is not a string argument, which D-Bus
+        # match rules cannot filter on, so that is checked in the handler.
+        self.__subscription = self.__sysbus.signal_subscribe('net.openvpn.v3.sessions',
+                                                             'net.openvpn.v3.sessions',
+                                                             'SessionManagerEvent',
+                                                             '/net/openvpn/v3/sessions',
+                                                             None,
+                                                             Gio.DBusSignalFlags.NONE,
+                                                             self.__mgr_signal_handler)
+
+
+    def __mgr_signal_handler(self, conn, sender, path, interface, signal, params):
+        (sesspath, evtype, owner) = params.unpack()
 
         # Only care about VPN sessions the currently running user or root owns.
         # The reaons for root owned VPNs is that systemd managed sessions are
         # started by root.
-        if event.GetOwner() in [os.getuid(), 0]:
-            if SessionManagerEventType.SESS_CREATED == event.GetType():
-                # If it's a new VPN session, register to be able to track it
-                self.Register(event.GetPath())
-            elif SessionManagerEventType.SESS_DESTROYED == event.GetType():
-                # If the VPN session is being removed, check if we're
-                # monitoring it before shutting it down from our end as well
-                if event.GetPath() in self.__sessions:
-                    self.__sessions[event.GetPath()].Stop()
-                    self.__sessions.pop(event.GetPath())
+        if owner != _OWN_UID and owner != 0:
+            DEBUGF('{tstamp} Ignoring SessionManagerEvent for {} (owner: {})', sesspath, owner)
+            return
+        self.__mgr_event_handler(openvpn3.SessionManagerEvent(sesspath, evtype, owner))
 
 
-    def Register(self, path):
-        "Registers a new VPN session for monitoring"
-        DEBUG('SessionManagerWatcher::Register({})'.format(path))
+    def __mgr_event_handler(self, event):
+        "Event handler method for StatusManagerEvents"
 
-        # Retrieve the openvpn3.Session object from the D-Bus path
-        # and track a dedicated SessionWatcher object for this session
-        session = self.__sessmgr.Retrieve(path)
-        self.__sessions[path] = SessionWatcher(self.__notify, session)
+        # If debug logging is enabled, provide information on events
+        DEBUGF('{tstamp} {event}', event=event)
+
+        evtype = event.GetType()
+        path = event.GetPath()
+        if SessionManagerEventType.SESS_CREATED == evtype:
+            # If it's a new VPN session, register to be able to track it
+            self.__pending_register.append(path)
+            if not self.__register_scheduled:
+                self.__register_scheduled = True
+                GLib.idle_add(self.__drain_register)
+        elif SessionManagerEventType.SESS_DESTROYED == evtype:
+            # If the VPN session is being removed, check if we're
+            # monitoring it before shutting it down from our end as well
+            if path in self.__sessions:
+                self.__sessions.pop(path).Stop()
+            self.__config_cache.pop(path, None)
+            self.__fetching.pop(path, None)
+            if path in self.__pending_register:
+                self.__pending_register.remove(path)
+
+
+    def __drain_register(self):
+        """
+        Registers all sessions created since the last call.  The lookups
+        of the configuration names are all sent before any reply is
+        processed.
+        """
+        self.__register_scheduled = False
+        pending = self.__pending_register
+        self.__pending_register = []
+        for path in pending:
+            self.Register(path)
+        return False
 
 
-    def CheckStatus(self, session_path):
-        "Check and evaluate the session status for a specific session"
+    def __fetch(self, path, session, check_status):
+        """
+        Retrieves the configuration name of a session asynchronously,
+        unless it is already known.  The session is registered when the
+        result has arrived.  Requests for several sessions are all sent
+        without waiting for each other.
+        """
+        if path in self.__config_cache:
+            self.__register(path, session, check_status)
+            return
+
+        pending = _PendingSession(session, check_status)
+        self.__fetching[path] = pending
+        self.__sysbus.call('net.openvpn.v3.sessions', str(path),
+                           'org.freedesktop.DBus.Properties', 'Get',
+                           GLib.Variant('(ss)', ('net.openvpn.v3.sessions', 'config_name')),
+                           GLib.VariantType.new('(v)'),
+                           Gio.DBusCallFlags.NONE, -1, None,
+                           self.__fetch_done, (path, pending))
+
+
+    def __fetch_done(self, conn, result, data):
+        (path, pending) = data
+        if self.__fetching.get(path) is not pending:
+            # The session was removed while waiting
+            return
+        del self.__fetching[path]
+
+        try:
+            self.__config_cache[path] = conn.call_finish(result).unpack()[0]
+        except GLib.Error as excp:
+            # Let the SessionWatcher retry on its own
+            DEBUGF('Could not retrieve config_name for {}: {}', path, excp.message)
+
+        self.__register(path, pending.session, pending.check_status)
+
+
+    def __register(self, path, session, check_status):
+        DEBUGF('SessionManagerWatcher::Register({})', path)
 
-        if session_path in self.__sessions:
-            self.__sessions[session_path].CheckStatus()
+        # Retrieve the openvpn3.Session object from the D-Bus path, unless
+        # it is already available, and track a dedicated SessionWatcher
+        # object for this session
+        if session is None:
+            session = self.__sessmgr.Retrieve(path)
+        self.__sessions[path] = SessionWatcher(self.__notify, self.__sysbus, session,
+                                               self.__config_cache.get(path), check_status,
+                                               self.__watcher_failed)
+
+
+    def __watcher_failed(self, path, watcher):
+        "Drops a SessionWatcher which could not be started"
+
+        if self.__sessions.get(path) is watcher:
+            DEBUGF('Dropping SessionWatcher("{}")', path)
+            del self.__sessions[path]
+
+
+    def Register(self, path, session=None, check_status=False):
+        """
+        Registers a new VPN session for monitoring.  If an openvpn3.Session
+        object for the session is already available, it can be provided
+        via the session argument.  If check_status is True, the current
+        status of the session is retrieved and evaluated as well.
+        """
+
+        # Sessions already watched or being registered are left as they are.
+        # A SESS_CREATED event may arrive for a session which was already
+        # found when listing the existing sessions at startup.
+        if path in self.__sessions or path in self.__fetching:
+            return
+        self.__fetch(path, session, check_status)
 
 
 #
@@ -288,15 +963,22 @@ if __name__ == "__main__":
     dbusloop = DBusGMainLoop(set_as_default=True)
     bus = dbus.SystemBus(mainloop=dbusloop)
 
+    # Signal subscriptions are handled via a GDBus connection to the
+    # system bus, which processes the bus traffic in a separate worker
+    # thread and only dispatches the complete signals to the main loop
+    sysbus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+
     # Connect to the session manager, setup a session manager wathcer
     # which will listen to global events from this manager
     sessmgr = openvpn3.SessionManager(bus)
-    mgrwatcher = SessionManagerWatcher(sessmgr)
+    mgrwatcher = SessionManagerWatcher(sessmgr, sysbus)
 
-    # Register existing running sessions
+    # Register existing running sessions.  The lookups for all sessions
+    # are sent at once and handled as the replies arrive in the main loop.
+    # The current status of each session is checked once its watcher
+    # receives the StatusChange signals.
     for session in sessmgr.FetchAvailableSessions():
-        mgrwatcher.Register(session.GetPath())
-        mgrwatcher.CheckStatus(session.GetPath())
+        mgrwatcher.Register(session.GetPath(), session, check_status=True)
 
     # Start the main process
     try:
@@ -7,11 +7,12 @@
 #  Copyright (C) 2025 -       David Sommerseth <dazo@eurephia.org>
 
 import argparse
-import datetime
 import dbus
 import sys
+import time
+from functools import lru_cache
 from dbus.mainloop.glib import DBusGMainLoop
-from gi.repository import GLib
+from gi.repository import Gio, GLib
 
 import openvpn3
 from openvpn3 import StatusMajor, StatusMinor
@@ -20,27 +21,53 @@ from openvpn3 import StatusMajor, StatusMinor
 # for asynchronous event handling
 mainloop = GLib.MainLoop()
 
+# Indentation of log message continuation lines, aligning
+# them with the first line after the timestamp and tag
+LOG_INDENT = ' ' * 33
+
+
+# Timestamp with microseconds; the date and time part is reused within a second
+_ts_cache = (None, '')
+
+def _ts():
+    global _ts_cache
+    now = time.time()
+    sec = int(now)
+    if sec != _ts_cache[0]:
+        _ts_cache = (sec, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(sec)))
+    return '%s.%06d' % (_ts_cache[1], int((now - sec) * 1000000))
+
+
+# Status values are converted to constants and rendered as strings
+# for every StatusChange event; cache the results of both.  Returns
+# a tuple of (StatusMajor, StatusMinor, major string, minor string).
+@lru_cache(maxsize=64)
+def status_lookup(major, minor):
+    maj = StatusMajor(major)
+    min = StatusMinor(minor)
+    return (maj, min, str(maj), str(min))
+
 
 # Log event callback function, called each time a
 # net.openvpn.v3.session.Log signal is sent by the
 # OpenVPN 3 Session Manager
 def LogHandler(group, catg, msg):
-    loglines = [l for l in msg.split('\n') if len(l) > 0]
-    if len(loglines) < 1:
+    loglines = [l for l in msg.splitlines() if l]
+    if not loglines:
         return
 
-    print('%s [LOG] %s' % (datetime.datetime.now(), loglines[0]))
-    for line in loglines[1:]:
-        print('%s%s' % (' ' * 33, line))
+    # Write all the lines of a log event in a single operation
+    buf = ['%s [LOG] %s\n' % (_ts(), loglines[0])]
+    buf.extend(LOG_INDENT + line + '\n' for line in loglines[1:])
+    sys.stdout.write(''.join(buf))
 
 # Status change event callback function, called each time a
 # net.openvpn.v3.session.StatusChange signal is sent by the
 # OpenVPN 3 Session Manager
 def StatusHandler(major, minor, msg):
-    maj = StatusMajor(major)
-    min = StatusMinor(minor)
+    (maj, min, majstr, minstr) = status_lookup(major, minor)
 
-    print('%s [STATUS] (%s, %s) %s' % (datetime.datetime.now(), maj, min, msg))
+    print('%s [STATUS] (%s, %s) %s' % (_ts(), majstr, minstr, msg))
 
     # Session got most likely disconnected outside of this program
     if StatusMajor.SESSION == maj and StatusMinor.PROC_STOPPED == min:
@@ -53,6 +80,21 @@ def StatusHandler(major, minor, msg):
         mainloop.quit()
 
 
+# Generic GDBus signal callback, passing the signal arguments
+# on to the LogHandler or StatusHandler function
+def SignalHandler(conn, sender, path, interface, signal, params, handler):
+    handler(*params.unpack()[:3])
+
+
+# Enable or disable the log forwarding for a VPN session.  Both
+# Log and StatusChange signals depend on this being enabled.
+def LogForward(sysconn, session_path, enable):
+    sysconn.call_sync('net.openvpn.v3.sessions', session_path,
+                      'net.openvpn.v3.sessions', 'LogForward',
+                      GLib.Variant('(b)', (enable,)), None,
+                      Gio.DBusCallFlags.NONE, -1, None)
+
+
 if __name__ == '__main__':
     # Prepare an argument parser
     optparser = argparse.ArgumentParser('watch-session-log',
@@ -73,6 +115,10 @@ if __name__ == '__main__':
     dbusloop = DBusGMainLoop(set_as_default=True)
     sysbus = dbus.SystemBus(mainloop=dbusloop)
 
+    # Signals are subscribed to via a GDBus connection, which receives
+    # them in a separate worker thread and dispatches them to the main loop
+    sysconn = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+
     # Connect to the OpenVPN 3 Session Manager
     sessionmgr = openvpn3.SessionManager(sysbus)
 
@@ -94,8 +140,14 @@ if __name__ == '__main__':
     # Retrieve the Session object for this VPN session
     # and prepare the callback handler for log and status change events
     session = sessionmgr.Retrieve(session_path)
-    session.LogCallback(LogHandler)
-    session.StatusChangeCallback(StatusHandler)
+    subscriptions = [sysconn.signal_subscribe('net.openvpn.v3.log',
+                                              'net.openvpn.v3.backends',
+                                              signal, str(session_path), None,
+                                              Gio.DBusSignalFlags.NONE,
+                                              SignalHandler, handler)
+                     for (signal, handler) in (('Log', LogHandler),
+                                               ('StatusChange', StatusHandler))]
+    LogForward(sysconn, str(session_path), True)
 
     # If a specific log level is required, set that
     if opts.log_level is not None:
@@ -107,8 +159,14 @@ if __name__ == '__main__':
     except KeyboardInterrupt:
         print("Stopping")
 
-    # Disable the log callback, this will also clean up
+    # Disable the log forwarding, this will also clean up
     # the log proxy infrastructure in the OpenVPN 3 Session Manager
-    session.LogCallback(None)
+    for sub in subscriptions:
+        sysconn.signal_unsubscribe(sub)
+    try:
+        LogForward(sysconn, str(session_path), False)
+    except GLib.Error:
+        # The session is typically already removed
+        pass
 
     sys.exit(0)